@@ -214,19 +214,17 @@ def complete_dictionary(dictionary: dict, base_dictionary: dict) -> dict:
         dict: the completed (merged) dictionary
     """
     if base_dictionary:
-        for k, v in base_dictionary.items():
-            if isinstance(v, dict):
-                if k not in dictionary.keys():
-                    dictionary[k] = v
-                else:
-                    if not isinstance(dictionary[k], dict):
+        stack = [(dictionary, base_dictionary)]
+        while stack:
+            target, base = stack.pop()
+            for k, v in base.items():
+                if k not in target:
+                    target[k] = v
+                elif isinstance(v, dict):
+                    if not isinstance(target[k], dict):
                         raise ValueError(
-                            "Cannot merge dictionaries. "
-                            f"Mismatch on Key {k}: {dictionary[k]}, {v}.",
+                            f"Cannot merge dictionaries. Mismatch on Key {k}: {target[k]}, {v}.",
                         )
-                    dictionary[k] = complete_dictionary(dictionary[k], v)
-            else:
-                if k not in dictionary.keys():
-                    dictionary[k] = v
+                    stack.append((target[k], v))
 
     return dictionary
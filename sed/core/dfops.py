@@ -3,6 +3,8 @@
 """
 # Note: some of the functions presented here were
 # inspired by https://github.com/mpes-kit/mpes
+import threading
+from contextlib import nullcontext
 from typing import Callable
 from typing import Sequence
 from typing import Union
@@ -12,6 +14,14 @@ import numpy as np
 import pandas as pd
 from dask.diagnostics import ProgressBar
 
+try:
+    import numexpr
+except ImportError:  # pragma: no cover
+    numexpr = None
+
+# per-thread jitter buffer, reused between dataframe partitions
+_JITTER_STATE = threading.local()
+
 
 def apply_jitter(
     df: Union[pd.DataFrame, dask.dataframe.DataFrame],
@@ -56,18 +66,88 @@ def apply_jitter(
 
     colsize = df[cols[0]].size
 
+    if isinstance(df, pd.DataFrame):
+        # the jittered columns are new arrays, so the buffer can be reused
+        jitter = _generate_jitter(colsize, jitter_type, out=_jitter_buffer(colsize))
+        for col, col_jittered, amp in zip(cols, cols_jittered, amps):
+            df[col_jittered] = _add_scaled(df[col].to_numpy(copy=False), amp, jitter)
+    else:
+        jitter = _generate_jitter(colsize, jitter_type)
+        for col, col_jittered, amp in zip(cols, cols_jittered, amps):
+            df[col_jittered] = df[col] + amp * jitter
+
+    return df
+
+
+def _generate_jitter(size: int, jitter_type: str, out: np.ndarray = None) -> np.ndarray:
+    """Draw jitter values from a random generator seeded by the global numpy random state.
+
+    Args:
+        size (int): Number of values to draw.
+        jitter_type (str): 'uniform' for values in [-1, 1), or 'normal' for standard
+            normal distributed values.
+        out (np.ndarray, optional): Float64 array of length size to fill. If None,
+            a new array is allocated. Defaults to None.
+
+    Returns:
+        np.ndarray: The jitter values.
+    """
+    # seed the generator from the global numpy random state, so that np.random.seed()
+    # keeps making the jitter reproducible
+    rng = np.random.default_rng(np.random.randint(2**32, dtype=np.uint64))
+    if out is None:
+        out = np.empty(size, dtype=np.float64)
+
     if jitter_type == "uniform":
         # Uniform Jitter distribution
-        jitter = np.random.uniform(low=-1, high=1, size=colsize)
+        rng.random(out=out)
+        out *= 2
+        out -= 1
     elif jitter_type == "normal":
         # Normal Jitter distribution works better for non-linear transformations and
         # jitter sizes that don't match the original bin sizes
-        jitter = np.random.standard_normal(size=colsize)
+        rng.standard_normal(out=out)
 
-    for col, col_jittered, amp in zip(cols, cols_jittered, amps):
-        df[col_jittered] = df[col] + amp * jitter
+    return out
 
-    return df
+
+def _jitter_buffer(size: int) -> np.ndarray:
+    """Returns a float64 view of length size into the jitter buffer of the current thread,
+    growing the buffer if required.
+
+    Args:
+        size (int): Required length.
+
+    Returns:
+        np.ndarray: The buffer view.
+    """
+    buffer = getattr(_JITTER_STATE, "buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = _JITTER_STATE.buffer = np.empty(size, dtype=np.float64)
+    return buffer[:size]
+
+
+def _add_scaled(values: np.ndarray, amp: float, jitter: np.ndarray) -> np.ndarray:
+    """Compute ``values + amp * jitter`` in a single pass without intermediate arrays.
+
+    Uses numexpr if available, and falls back to in-place numpy operations otherwise.
+
+    Args:
+        values (np.ndarray): The column values.
+        amp (float): Amplitude scaling for the jitter.
+        jitter (np.ndarray): The jitter array, of the same size as values.
+
+    Returns:
+        np.ndarray: The jittered values.
+    """
+    if numexpr is not None:
+        return numexpr.evaluate(
+            "c + a * j",
+            local_dict={"c": values, "a": np.float64(amp), "j": jitter},
+        )
+    out = np.multiply(jitter, amp)
+    np.add(out, values, out=out)
+    return out
 
 
 def drop_column(
@@ -232,17 +312,18 @@ def forward_fill_lazy(
 
     # Define a custom function to forward fill specified columns
     def forward_fill_partition(df):
-        df[columns] = df[columns].ffill()
+        # Filling column by column avoids building and reassigning a sub-frame of all columns
+        for column in columns:
+            df[column] = df[column].ffill()
         return df
 
     # calculate the number of rows in each partition and choose least
     if before == "max":
-        nrows = df.map_partitions(len)
-        if compute_lengths:
-            with ProgressBar():
+        min_nrows = df.reduction(len, aggregate=np.min, meta=int)
+        with ProgressBar() if compute_lengths else nullcontext():
+            if compute_lengths:
                 print("Computing dataframe shape...")
-                nrows = nrows.compute()
-        before = min(nrows)
+            before = int(min_nrows.compute())
     elif not isinstance(before, int):
         raise TypeError('before must be an integer or "max"')
     # Use map_overlap to apply forward_fill_partition
@@ -292,17 +373,17 @@ def backward_fill_lazy(
 
     # Define a custom function to forward fill specified columns
     def backward_fill_partition(df):
-        df[columns] = df[columns].bfill()
+        for column in columns:
+            df[column] = df[column].bfill()
         return df
 
     # calculate the number of rows in each partition and choose least
     if after == "max":
-        nrows = df.map_partitions(len)
-        if compute_lengths:
-            with ProgressBar():
+        min_nrows = df.reduction(len, aggregate=np.min, meta=int)
+        with ProgressBar() if compute_lengths else nullcontext():
+            if compute_lengths:
                 print("Computing dataframe shape...")
-                nrows = nrows.compute()
-        after = min(nrows)
+            after = int(min_nrows.compute())
     elif not isinstance(after, int):
         raise TypeError('before must be an integer or "max"')
     # Use map_overlap to apply forward_fill_partition
@@ -401,16 +482,27 @@ def offset_by_other_columns(
     # define the functions to apply the offsets
     def shift_by_mean(x, cols, signs, means, flip_signs=False):
         """Shift the target column by the mean of the offset columns."""
+        shift = 0
         for col in cols:
             s = -signs[col] if flip_signs else signs[col]
-            x[target_column] = x[target_column] + s * means[col]
-        return x[target_column]
+            shift += s * means[col]
+        return x[target_column] + shift
 
     def shift_by_row(x, cols, signs):
         """Apply the offsets to the target column."""
-        for col in cols:
-            x[target_column] = x[target_column] + signs[col] * x[col]
-        return x[target_column]
+        if not cols:
+            return x[target_column]
+        # accumulate on the underlying arrays to avoid index alignment and temporaries
+        target = x[target_column].to_numpy(copy=False)
+        offsets = [x[col].to_numpy(copy=False) for col in cols]
+        # accumulate in the common dtype of all operands
+        result = target.astype(
+            np.result_type(target, *offsets, *(signs[col] for col in cols)),
+            copy=True,
+        )
+        for col, offset in zip(cols, offsets):
+            result += signs[col] * offset
+        return pd.Series(result, index=x.index, name=target_column)
 
     # apply offset from the reduced columns
     df[target_column] = df.map_partitions(
@@ -422,11 +514,16 @@ def offset_by_other_columns(
     )
 
     # apply offset from the offset columns
+    row_columns = [col for col, red in zip(offset_columns, reductions) if not red]
     df[target_column] = df.map_partitions(
         shift_by_row,
-        cols=[col for col, red in zip(offset_columns, reductions) if not red],
+        cols=row_columns,
         signs=signs_dict,
-        meta=df[target_column].dtype,
+        meta=np.result_type(
+            df[target_column].dtype,
+            *(df[col].dtype for col in row_columns),
+            *(signs_dict[col] for col in row_columns),
+        ),
     )
 
     # compensate shift from the preserved mean columns
@@ -7,6 +7,10 @@ from typing import Dict
 
 from sed.core.config import complete_dictionary
 
+# limits for the string representations of the metadata
+MAX_REPR_DEPTH = 5
+MAX_REPR_ITEMS = 50
+
 
 class MetaHandler:
     """This class provides methods to manipulate metadata dictionaries,
@@ -19,7 +23,7 @@ class MetaHandler:
         return self._m[val]
 
     def __repr__(self) -> str:
-        return json.dumps(self._m, default=str, indent=4)
+        return json.dumps(_truncate(self._m), default=str, indent=4)
 
     def _format_attributes(self, attributes, indent=0):
         INDENT_FACTOR = 20
@@ -42,7 +46,7 @@ class MetaHandler:
         return html
 
     def _repr_html_(self) -> str:
-        html = self._format_attributes(self._m)
+        html = self._format_attributes(_truncate(self._m))
         return html
 
     @property
@@ -109,6 +113,29 @@ class MetaHandler:
             )
 
 
+def _truncate(value: Any, depth: int = 0) -> Any:
+    """Returns a copy of nested dictionaries and lists, where levels deeper than
+    MAX_REPR_DEPTH and list items beyond MAX_REPR_ITEMS are replaced by "...".
+
+    Args:
+        value (Any): The value to truncate.
+        depth (int, optional): The current nesting depth. Defaults to 0.
+
+    Returns:
+        Any: The truncated value.
+    """
+    if isinstance(value, (dict, list, tuple)) and depth >= MAX_REPR_DEPTH:
+        return "..."
+    if isinstance(value, dict):
+        return {key: _truncate(val, depth + 1) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_truncate(val, depth + 1) for val in value[:MAX_REPR_ITEMS]]
+        if len(value) > MAX_REPR_ITEMS:
+            items.append("...")
+        return type(value)(items)
+    return value
+
+
 class DuplicateEntryError(Exception):
     """Exception raised when attempting to add a duplicate entry to the metadata container.
 
@@ -10,6 +10,18 @@ import numpy as np
 from bokeh.io import output_notebook
 from bokeh.layouts import gridplot
 
+# Keywords of ``matplotlib.pyplot.hist()`` that neither ``np.histogram`` nor
+# ``Axes.stairs``/``Axes.bar`` understand
+HIST_ONLY_KEYWORDS = {
+    "cumulative",
+    "bottom",
+    "align",
+    "orientation",
+    "rwidth",
+    "log",
+    "stacked",
+}
+
 
 def plot_single_hist(
     histvals: np.ndarray,
@@ -73,8 +85,8 @@ def grid_histogram(
             Defaults to "bokeh".
         legend (bool, optional): Option to include a legend in each histogram plot.
             Defaults to True.
-        histkwds (dict, optional): Keyword arguments for histogram plots.
-            Defaults to None.
+        histkwds (dict, optional): Keyword arguments for histogram plots
+            (see ``matplotlib.pyplot.hist()``). Defaults to None.
         legkwds (dict, optional): Keyword arguments for legends. Defaults to None.
         **kwds: Additional keyword arguments.
     """
@@ -90,6 +102,14 @@ def grid_histogram(
         nrow = int(np.ceil(nrv / ncol))
         histtype = kwds.pop("histtype", "step")
 
+        # Keywords understood by np.histogram are applied there; any other
+        # ax.hist()-only keyword or histtype falls back to ax.hist()
+        histogram_kwds = {key: histkwds[key] for key in ("weights", "density") if key in histkwds}
+        plot_kwds = {key: val for key, val in histkwds.items() if key not in histogram_kwds}
+        use_hist = histtype not in ("step", "stepfilled", "bar") or any(
+            key in HIST_ONLY_KEYWORDS for key in plot_kwds
+        )
+
         fig, ax = plt.subplots(nrow, ncol, figsize=figsz)
         otherax = ax.copy()
         for i, zipped in enumerate(zip(rvs, rvbins, rvranges)):
@@ -97,7 +117,13 @@ def grid_histogram(
             rvname, rvbin, rvrg = zipped
             try:
                 axind = np.unravel_index(i, (nrow, ncol))
-                ax[axind].hist(
+                cax = ax[axind]
+            except IndexError:
+                axind = i
+                cax = ax[i]
+
+            if use_hist:
+                cax.hist(
                     dct[rvname],
                     bins=rvbin,
                     range=rvrg,
@@ -105,24 +131,34 @@ def grid_histogram(
                     histtype=histtype,
                     **histkwds,
                 )
-                if legend:
-                    ax[axind].legend(fontsize=15, **legkwds)
-
-                otherax[axind] = None
-
-            except IndexError:
-                ax[i].hist(
+            else:
+                histvals, edges = np.histogram(
                     dct[rvname],
                     bins=rvbin,
                     range=rvrg,
-                    label=rvname,
-                    histtype=histtype,
-                    **histkwds,
+                    **histogram_kwds,
                 )
-                if legend:
-                    ax[i].legend(fontsize=15, **legkwds)
+                if histtype == "bar":
+                    cax.bar(
+                        edges[:-1],
+                        histvals,
+                        width=np.diff(edges),
+                        align="edge",
+                        label=rvname,
+                        **plot_kwds,
+                    )
+                else:
+                    cax.stairs(
+                        histvals,
+                        edges,
+                        fill=histtype == "stepfilled",
+                        label=rvname,
+                        **plot_kwds,
+                    )
+            if legend:
+                cax.legend(fontsize=15, **legkwds)
 
-                otherax[i] = None
+            otherax[axind] = None
 
         for oax in otherax.flatten():
             if oax is not None:
@@ -10,28 +10,99 @@ sed functionality.
 import time
 from functools import reduce
 from pathlib import Path
+from typing import Dict
 from typing import List
 from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+import dask
 import dask.dataframe as dd
 import h5py
+import numba
 import numpy as np
+import psutil
+import pyarrow as pa
 import pyarrow.parquet as pq
 from joblib import delayed
 from joblib import Parallel
 from natsort import natsorted
+from pandas import concat
 from pandas import DataFrame
+from pandas import Index
 from pandas import MultiIndex
 from pandas import Series
 
 from sed.core import dfops
 from sed.loader.base.loader import BaseLoader
 from sed.loader.flash.metadata import MetadataRetriever
-from sed.loader.utils import parse_h5_keys
+from sed.loader.utils import read_h5_dataset
 from sed.loader.utils import split_dld_time_from_sector_id
 
+N_CPU = psutil.cpu_count()
+# Write settings of the buffer and combined parquet files
+PARQUET_ROW_GROUP_SIZE = 131072
+PARQUET_COMPRESSION = {"compression": "zstd", "compression_level": 1}
+
+
+@numba.jit(nogil=True, nopython=True, cache=True)
+def _electron_index(
+    train_ids: np.ndarray,
+    pulse_ids: np.ndarray,
+    offset: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Builds the (trainId, pulseId, electronId) index levels of the electron resolved data,
+    pre-compiled by Numba for performance.
+
+    Args:
+        train_ids (np.ndarray): The trainId of each row of pulse_ids.
+        pulse_ids (np.ndarray): The 2D array of pulseIds of the electrons per train, padded
+            with NaN.
+        offset (int): The offset subtracted from the pulseIds.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The trainIds, pulseIds and
+        electronIds of all electrons sorted by (trainId, pulseId), and the indexer which sorts
+        the electrons in file order accordingly. The indexer is empty if they are already sorted.
+    """
+    n_electrons = 0
+    for value in pulse_ids.ravel():
+        if not np.isnan(value):
+            n_electrons += 1
+
+    train_out = np.empty(n_electrons, np.int64)
+    pulse_out = np.empty(n_electrons, np.int64)
+    keys = np.empty(n_electrons, np.int64)
+    is_sorted = True
+    k = 0
+    for i in range(pulse_ids.shape[0]):
+        for j in range(pulse_ids.shape[1]):
+            value = pulse_ids[i, j]
+            if not np.isnan(value):
+                train_out[k] = train_ids[i]
+                pulse_out[k] = int(value - offset)
+                # Pack (trainId, pulseId) into a single integer key
+                keys[k] = (train_out[k] << 32) | (pulse_out[k] & 0xFFFFFFFF)
+                if k > 0 and keys[k] < keys[k - 1]:
+                    is_sorted = False
+                k += 1
+
+    if is_sorted:
+        indexer = np.empty(0, np.int64)
+    else:
+        indexer = np.argsort(keys, kind="mergesort")
+        keys = keys[indexer]
+        train_out = train_out[indexer]
+        pulse_out = pulse_out[indexer]
+
+    # Electron counter within each (trainId, pulseId) group
+    electron_out = np.zeros(n_electrons, np.int64)
+    for k in range(1, n_electrons):
+        if keys[k] == keys[k - 1]:
+            electron_out[k] = electron_out[k - 1] + 1
+
+    return train_out, pulse_out, electron_out, indexer
+
 
 class FlashLoader(BaseLoader):
     """
@@ -49,7 +120,24 @@ class FlashLoader(BaseLoader):
         self.multi_index = ["trainId", "pulseId", "electronId"]
         self.index_per_electron: MultiIndex = None
         self.index_per_pulse: MultiIndex = None
+        self._index_per_pulse_train_id: np.ndarray = None
+        self.electron_indexer: np.ndarray = None
         self.failed_files_error: List[str] = []
+        # The datasets read from the current file, keyed by (file name, dataset key)
+        self._dataset_cache: Dict[Tuple[str, str], np.ndarray] = {}
+        # The (index, value) dataset keys of each channel, which are the same for all files
+        self._dataset_keys: Dict[str, Tuple[str, str]] = {
+            channel: (
+                channel_dict["group_name"] + "index",
+                channel_dict["group_name"] + ("time" if channel == "timeStamp" else "value"),
+            )
+            for channel, channel_dict in self._config["dataframe"].get("channels", {}).items()
+        }
+        # The available channels of each format, excluding dldAux
+        self._channels_by_format: Dict[str, List[str]] = {}
+        for channel, channel_dict in self._config["dataframe"].get("channels", {}).items():
+            if channel not in ("pulseId", "dldAux"):
+                self._channels_by_format.setdefault(channel_dict.get("format"), []).append(channel)
 
     def initialize_paths(self) -> Tuple[List[Path], Path]:
         """
@@ -172,9 +260,9 @@ class FlashLoader(BaseLoader):
     def available_channels(self) -> List:
         """Returns the channel names that are available for use,
         excluding pulseId, defined by the json file"""
-        available_channels = list(self._config["dataframe"]["channels"].keys())
-        available_channels.remove("pulseId")
-        return available_channels
+        return [
+            channel for channel in self._config["dataframe"]["channels"] if channel != "pulseId"
+        ]
 
     def get_channels(self, formats: Union[str, List[str]] = "", index: bool = False) -> List[str]:
         """
@@ -200,12 +288,7 @@ class FlashLoader(BaseLoader):
         channels = []
         for format_ in formats:
             # Gather channels based on the specified format(s).
-            channels.extend(
-                key
-                for key in self.available_channels
-                if self._config["dataframe"]["channels"][key]["format"] == format_
-                and key != "dldAux"
-            )
+            channels.extend(self._channels_by_format.get(format_, []))
             # Include 'dldAuxChannels' if the format is 'per_pulse'.
             if format_ == "per_pulse":
                 channels.extend(
@@ -222,6 +305,8 @@ class FlashLoader(BaseLoader):
         """Resets the index per pulse and electron"""
         self.index_per_electron = None
         self.index_per_pulse = None
+        self._index_per_pulse_train_id = None
+        self.electron_indexer = None
 
     def create_multi_index_per_electron(self, h5_file: h5py.File) -> None:
         """
@@ -244,74 +329,87 @@ class FlashLoader(BaseLoader):
             "pulseId",
         )
 
-        # Create a series with the macrobunches as index and
-        # microbunches as values
-        macrobunches = (
-            Series(
-                (np_array[i] for i in train_id.index),
-                name="pulseId",
-                index=train_id,
-            )
-            - self._config["dataframe"]["ubid_offset"]
+        # The pulseIds of the electrons within a train are not always in order, so the electrons
+        # are sorted by (trainId, pulseId) to group the electrons of each pulse
+        train_ids, pulse_ids, electrons, indexer = _electron_index(
+            train_id.to_numpy().astype(np.int64),
+            np.asarray(np_array),
+            self._config["dataframe"]["ubid_offset"],
         )
-
-        # Explode dataframe to get all microbunch vales per macrobunch,
-        # remove NaN values and convert to type int
-        microbunches = macrobunches.explode().dropna().astype(int)
-
-        # Create temporary index values
-        index_temp = MultiIndex.from_arrays(
-            (microbunches.index, microbunches.values),
-            names=["trainId", "pulseId"],
-        )
-
-        # Calculate the electron counts per pulseId unique preserves the order of appearance
-        electron_counts = index_temp.value_counts()[index_temp.unique()].values
-
-        # Series object for indexing with electrons
-        electrons = (
-            Series(
-                [np.arange(electron_counts[i]) for i in range(electron_counts.size)],
+        # The electrons with negative pulseIds (meaningless) are removed from the index, and the
+        # indexer selects only the remaining ones from the channel data
+        keep = pulse_ids >= 0
+        if not keep.all():
+            indexer = indexer[keep] if indexer.size > 0 else np.flatnonzero(keep)
+            train_ids, pulse_ids, electrons = train_ids[keep], pulse_ids[keep], electrons[keep]
+        self.electron_indexer = indexer if indexer.size > 0 else None
+        train_ids = train_ids.astype(train_id.dtype, copy=False)
+
+        # Create a pandas MultiIndex from the flattened arrays. The levels and codes are known
+        # from the sorted, non-negative arrays, so they don't need to be factorized
+        if train_ids.size == 0:
+            self.index_per_electron = MultiIndex.from_arrays(
+                (train_ids, pulse_ids, electrons),
+                names=self.multi_index,
             )
-            .explode()
-            .astype(int)
-        )
-
-        # Create a pandas MultiIndex using the exploded datasets
-        self.index_per_electron = MultiIndex.from_arrays(
-            (microbunches.index, microbunches.values, electrons),
+            return
+        new_train = np.empty(train_ids.size, dtype=bool)
+        new_train[0] = True
+        np.not_equal(train_ids[1:], train_ids[:-1], out=new_train[1:])
+        self.index_per_electron = MultiIndex(
+            levels=(
+                train_ids[new_train],
+                np.arange(pulse_ids.max() + 1),
+                np.arange(electrons.max() + 1),
+            ),
+            codes=(np.cumsum(new_train) - 1, pulse_ids, electrons),
             names=self.multi_index,
+            verify_integrity=False,
         )
 
     def create_multi_index_per_pulse(
         self,
-        train_id: Series,
+        train_id: Index,
         np_array: np.ndarray,
-    ) -> None:
+    ) -> MultiIndex:
         """
         Creates an index per pulse using a pulse resolved channel's macrobunch ID, for usage with
         the pulse resolved pandas DataFrame.
 
         Args:
-            train_id (Series): The train ID Series.
+            train_id (Index): The train IDs.
             np_array (np.ndarray): The numpy array containing the pulse resolved data.
 
+        Returns:
+            MultiIndex: The created index, which is also stored as index_per_pulse.
+
         Notes:
             - This method creates a MultiIndex with trainId and pulseId as the index levels.
         """
 
+        # Channels on the same trains with the same number of pulses share the index, so that
+        # their data frames can be stacked without aligning them
+        if (
+            self.index_per_pulse is not None
+            and len(self.index_per_pulse) == train_id.size * np_array.shape[1]
+            and np.array_equal(self._index_per_pulse_train_id, train_id.to_numpy())
+        ):
+            return self.index_per_pulse
+
         # Create a pandas MultiIndex, useful for comparing electron and
         # pulse resolved dataframes
         self.index_per_pulse = MultiIndex.from_product(
             (train_id, np.arange(0, np_array.shape[1])),
             names=["trainId", "pulseId"],
         )
+        self._index_per_pulse_train_id = train_id.to_numpy()
+        return self.index_per_pulse
 
     def create_numpy_array_per_channel(
         self,
         h5_file: h5py.File,
         channel: str,
-    ) -> Tuple[Series, np.ndarray]:
+    ) -> Tuple[Index, np.ndarray]:
         """
         Returns a numpy array for a given channel name for a given file.
 
@@ -320,37 +418,84 @@ class FlashLoader(BaseLoader):
             channel (str): The name of the channel.
 
         Returns:
-            Tuple[Series, np.ndarray]: A tuple containing the train ID Series and the numpy array
+            Tuple[Index, np.ndarray]: A tuple containing the train IDs and the numpy array
             for the channel's data.
 
         """
-        # Get the data from the necessary h5 file and channel
-        group = h5_file[self._config["dataframe"]["channels"][channel]["group_name"]]
-
         channel_dict = self._config["dataframe"]["channels"][channel]  # channel parameters
+        index_key, dataset_key = self._dataset_keys[channel]
 
-        train_id = Series(group["index"], name="trainId")  # macrobunch
+        train_id = Index(self.read_dataset(h5_file, index_key), name="trainId")
 
         # unpacks the timeStamp or value
-        if channel == "timeStamp":
-            np_array = group["time"][()]
-        else:
-            np_array = group["value"][()]
+        np_array = self.read_dataset(h5_file, dataset_key)
 
         # Use predefined axis and slice from the json file
         # to choose correct dimension for necessary channel
         if "slice" in channel_dict:
-            np_array = np.take(
-                np_array,
-                channel_dict["slice"],
-                axis=1,
-            )
+            index = channel_dict["slice"]
+            if isinstance(index, int):
+                # Basic indexing returns a view, so only the selected values are read from a
+                # memory-mapped dataset, and no copy is made
+                np_array = np_array[:, index]
+            elif len(index) > 0 and np.array_equal(index, np.arange(index[0], index[-1] + 1)):
+                np_array = np_array[:, index[0] : index[-1] + 1]
+            else:
+                np_array = np.take(
+                    np_array,
+                    index,
+                    axis=1,
+                )
         return train_id, np_array
 
+    def cast_to_channel_dtype(self, np_array: np.ndarray, channel: str) -> np.ndarray:
+        """
+        Casts the data of a channel to the optional dtype given in its configuration.
+
+        Args:
+            np_array (np.ndarray): The numpy array containing the channel data.
+            channel (str): The name of the channel.
+
+        Returns:
+            np.ndarray: The channel data in the configured dtype.
+
+        Raises:
+            ValueError: If the data contains NaN values, which cannot be represented by the
+                configured non-float dtype.
+        """
+        dtype = self._config["dataframe"]["channels"][channel].get("dtype", None)
+        if dtype is None:
+            return np_array
+        dtype = np.dtype(dtype)
+        if dtype.kind not in "fc" and np_array.dtype.kind in "fc" and np.isnan(np_array).any():
+            raise ValueError(
+                f"The data of channel {channel} contains NaN values, which cannot be cast "
+                f"to {dtype}. Use a float dtype for this channel.",
+            )
+        return np_array.astype(dtype, copy=False)
+
+    def read_dataset(self, h5_file: h5py.File, dataset_key: str) -> np.ndarray:
+        """
+        Reads a dataset from the h5 file, memory-mapping it if possible. The result is cached,
+        so that channels sharing the same dataset, e.g. the per electron channels, read it only
+        once per file.
+
+        Args:
+            h5_file (h5py.File): The h5py file object.
+            dataset_key (str): The full path of the dataset in the file.
+
+        Returns:
+            np.ndarray: The dataset content. It must not be modified in place.
+        """
+        cache_key = (h5_file.filename, dataset_key)
+        if cache_key not in self._dataset_cache:
+            self._dataset_cache[cache_key] = read_h5_dataset(h5_file[dataset_key])
+        return self._dataset_cache[cache_key]
+
     def create_dataframe_per_electron(
         self,
         np_array: np.ndarray,
-        train_id: Series,
+        train_id: Index,
         channel: str,
     ) -> DataFrame:
         """
@@ -358,34 +503,32 @@ class FlashLoader(BaseLoader):
 
         Args:
             np_array (np.ndarray): The numpy array containing the channel data.
-            train_id (Series): The train ID Series.
+            train_id (Index): The train IDs.
             channel (str): The name of the channel.
 
         Returns:
             DataFrame: The pandas DataFrame for the channel's data.
 
         Notes:
-            The microbunch resolved data is exploded and converted to a DataFrame. The MultiIndex
-            is set, and the NaN values are dropped, alongside the pulseId = 0 (meaningless).
-
-        """
-        return (
-            Series((np_array[i] for i in train_id.index), name=channel)
-            .explode()
-            .dropna()
-            .to_frame()
-            .set_index(self.index_per_electron)
-            .drop(
-                index=np.arange(-self._config["dataframe"]["ubid_offset"], 0),
-                level=1,
-                errors="ignore",
-            )
-        )
+            The microbunch resolved data is flattened and converted to a DataFrame. The MultiIndex
+            is set, and the NaN values are dropped. The electrons with negative pulseIds
+            (meaningless) are already excluded by the electron index and indexer.
+
+        """
+        values = np_array[: len(train_id)].ravel()
+        values = values[~np.isnan(values)]
+        # Apply the same ordering as used for the electron index
+        if self.electron_indexer is not None:
+            values = values[self.electron_indexer]
+        # Cast only now, since the NaN padding doesn't survive the cast to an integer dtype
+        values = self.cast_to_channel_dtype(values, channel)
+
+        return DataFrame({channel: values}, index=self.index_per_electron)
 
     def create_dataframe_per_pulse(
         self,
         np_array: np.ndarray,
-        train_id: Series,
+        train_id: Index,
         channel: str,
         channel_dict: dict,
     ) -> DataFrame:
@@ -394,7 +537,7 @@ class FlashLoader(BaseLoader):
 
         Args:
             np_array (np.ndarray): The numpy array containing the channel data.
-            train_id (Series): The train ID Series.
+            train_id (Index): The train IDs.
             channel (str): The name of the channel.
             channel_dict (dict): The dictionary containing channel parameters.
 
@@ -405,37 +548,33 @@ class FlashLoader(BaseLoader):
             - For auxiliary channels, the macrobunch resolved data is repeated 499 times to be
               compared to electron resolved data for each auxiliary channel. The data is then
               converted to a multicolumn DataFrame.
-            - For all other pulse resolved channels, the macrobunch resolved data is exploded
-              to a DataFrame and the MultiIndex is set.
+            - For all other pulse resolved channels, the macrobunch resolved data is flattened
+              to a DataFrame with the MultiIndex.
 
         """
 
         # Special case for auxiliary channels
         if channel == "dldAux":
             # Checks the channel dictionary for correct slices and creates a multicolumn DataFrame
-            data_frames = (
-                Series(
-                    (np_array[i, value] for i in train_id.index),
-                    name=key,
-                    index=train_id,
-                ).to_frame()
-                for key, value in channel_dict["dldAuxChannels"].items()
+            data = DataFrame(
+                {
+                    key: np_array[:, value]
+                    for key, value in sorted(channel_dict["dldAuxChannels"].items())
+                },
+                index=train_id,
             )
 
-            # Multiindex set and combined dataframe returned
-            data = reduce(DataFrame.combine_first, data_frames)
-
         # For all other pulse resolved channels
         else:
-            # Macrobunch resolved data is exploded to a DataFrame and the MultiIndex is set
+            # Macrobunch resolved data is flattened to a DataFrame with the MultiIndex
 
             # Creates the index_per_pulse for the given channel
-            self.create_multi_index_per_pulse(train_id, np_array)
-            data = (
-                Series((np_array[i] for i in train_id.index), name=channel)
-                .explode()
-                .to_frame()
-                .set_index(self.index_per_pulse)
+            index_per_pulse = self.create_multi_index_per_pulse(train_id, np_array)
+            values = np_array.reshape(len(index_per_pulse), -1)
+            # Pulse resolved channels with a trailing unit axis hold one scalar per pulse
+            data = DataFrame(
+                {channel: values[:, 0] if values.shape[1] == 1 else list(values)},
+                index=index_per_pulse,
             )
 
         return data
@@ -443,7 +582,7 @@ class FlashLoader(BaseLoader):
     def create_dataframe_per_train(
         self,
         np_array: np.ndarray,
-        train_id: Series,
+        train_id: Index,
         channel: str,
     ) -> DataFrame:
         """
@@ -451,16 +590,15 @@ class FlashLoader(BaseLoader):
 
         Args:
             np_array (np.ndarray): The numpy array containing the channel data.
-            train_id (Series): The train ID Series.
+            train_id (Index): The train IDs.
             channel (str): The name of the channel.
 
         Returns:
             DataFrame: The pandas DataFrame for the channel's data.
         """
-        return (
-            Series((np_array[i] for i in train_id.index), name=channel)
-            .to_frame()
-            .set_index(train_id)
+        return DataFrame(
+            {channel: np_array if np_array.ndim == 1 else list(np_array)},
+            index=train_id,
         )
 
     def create_dataframe_per_channel(
@@ -494,14 +632,12 @@ class FlashLoader(BaseLoader):
 
         # If np_array is size zero, fill with NaNs
         if np_array.size == 0:
-            # Fill the np_array with NaN values of the same shape as train_id
-            np_array = np.full_like(train_id, np.nan, dtype=np.double)
-            # Create a Series using np_array, with train_id as the index
-            data = Series(
-                (np_array[i] for i in train_id.index),
-                name=channel,
-                index=train_id,
-            )
+            # Fill the np_array with NaN values of the same shape as train_id. The data frame
+            # itself is built by the format specific method below.
+            np_array = np.full(len(train_id), np.nan)
+        elif channel_dict["format"] != "per_electron":
+            # The per electron channels are cast once their NaN padding is removed
+            np_array = self.cast_to_channel_dtype(np_array, channel)
 
         # Electron resolved data is treated here
         if channel_dict["format"] == "per_electron":
@@ -561,25 +697,55 @@ class FlashLoader(BaseLoader):
             ValueError: If the group_name for any channel does not exist in the file.
 
         """
-        all_keys = parse_h5_keys(h5_file)  # Parses all channels present
-
-        # Check for if the provided group_name actually exists in the file
-        for channel in self._config["dataframe"]["channels"]:
-            if channel == "timeStamp":
-                group_name = self._config["dataframe"]["channels"][channel]["group_name"] + "time"
-            else:
-                group_name = self._config["dataframe"]["channels"][channel]["group_name"] + "value"
-
-            if group_name not in all_keys:
+        # Check for if the provided group_name actually exists in the file. The datasets are
+        # looked up directly, instead of parsing all keys of the file.
+        for channel, (_, dataset_key) in self._dataset_keys.items():
+            if not isinstance(h5_file.get(dataset_key), h5py.Dataset):
                 raise ValueError(
                     f"The group_name for channel {channel} does not exist.",
                 )
 
-        # Create a generator expression to generate data frames for each channel
-        data_frames = (
-            self.create_dataframe_per_channel(h5_file, each) for each in self.available_channels
+        channels = self.available_channels
+        formats = [self._config["dataframe"]["channels"][each]["format"] for each in channels]
+
+        # The electron index is shared by all per electron channels, so create it beforehand
+        if self.index_per_electron is None and "per_electron" in formats:
+            self.create_multi_index_per_electron(h5_file)
+
+        def create_dataframes_per_format(format_: str) -> List[DataFrame]:
+            return [
+                self.create_dataframe_per_channel(h5_file, each)
+                for each, channel_format in zip(channels, formats)
+                if channel_format == format_
+            ]
+
+        # The channels of different formats are independent, so create their data frames in
+        # parallel threads
+        unique_formats = list(dict.fromkeys(formats))
+        data_frames_per_format = Parallel(n_jobs=len(unique_formats), backend="threading")(
+            delayed(create_dataframes_per_format)(format_) for format_ in unique_formats
         )
 
+        # Restore the order of the channels
+        iterators = {
+            format_: iter(data_frames)
+            for format_, data_frames in zip(unique_formats, data_frames_per_format)
+        }
+        data_frames = [next(iterators[format_]) for format_ in formats]
+
+        # Neighbouring data frames on the same index, e.g. the per electron channels, are
+        # stacked column-wise at once instead of being aligned by successive joins
+        blocks: List[List[DataFrame]] = []
+        for data_frame in data_frames:
+            if blocks and blocks[-1][0].index.equals(data_frame.index):
+                blocks[-1].append(data_frame)
+            else:
+                blocks.append([data_frame])
+        # The blocks share their index, so the column data doesn't need to be copied
+        data_frames = [
+            concat(block, axis=1, copy=False) if len(block) > 1 else block[0] for block in blocks
+        ]
+
         # Use the reduce function to join the data frames into a single DataFrame
         return reduce(
             lambda left, right: left.join(right, how="outer"),
@@ -605,10 +771,23 @@ class FlashLoader(BaseLoader):
 
         """
         # Loads h5 file and creates a dataframe
-        with h5py.File(file_path, "r") as h5_file:
+        # A larger chunk cache avoids re-reading chunks shared between channels of chunked files
+        with h5py.File(
+            file_path,
+            "r",
+            rdcc_nbytes=self._config["dataframe"].get("hdf5_chunk_cache_bytes", None),
+        ) as h5_file:
             self.reset_multi_index()  # Reset MultiIndexes for next file
-            df = self.concatenate_channels(h5_file)
-            df = df.dropna(subset=self._config["dataframe"].get("tof_column", "dldTimeSteps"))
+            try:
+                df = self.concatenate_channels(h5_file)
+            finally:
+                # Release the datasets read from this file
+                self._dataset_cache.clear()
+            # Remove the rows without an electron, skipping the copy if there are none
+            tof_column = self._config["dataframe"].get("tof_column", "dldTimeSteps")
+            has_tof = df[tof_column].notna().to_numpy()
+            if not has_tof.all():
+                df = df[has_tof]
             # correct the 3 bit shift which encodes the detector ID in the 8s time
             if self._config["dataframe"].get("split_sector_id_from_dld_time", False):
                 df = split_dld_time_from_sector_id(df, config=self._config)
@@ -630,10 +809,30 @@ class FlashLoader(BaseLoader):
 
         """
         try:
-            (
-                self.create_dataframe_per_file(h5_path)
-                .reset_index(level=self.multi_index)
-                .to_parquet(parquet_path, index=False)
+            df = self.create_dataframe_per_file(h5_path)
+            # Convert the index levels to columns on the arrow side, which avoids the copy of
+            # the whole dataframe by reset_index
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            # The pandas metadata would mark them as index, but they are read back as columns
+            table = table.select(self.multi_index + list(df.columns)).replace_schema_metadata()
+            # The pulse and electron counters are small, so narrower integers shrink the files
+            for name, dtype in (("pulseId", pa.int32()), ("electronId", pa.int16())):
+                field_index = table.schema.get_field_index(name)
+                if field_index >= 0 and pa.types.is_integer(table.schema.field(name).type):
+                    table = table.set_column(
+                        field_index,
+                        name,
+                        table.column(name).cast(dtype),
+                    )
+            # The time-of-flight values hardly repeat, so dictionary encoding does not pay off
+            tof_column = self._config["dataframe"].get("tof_column", "dldTimeSteps")
+            pq.write_table(
+                table,
+                parquet_path,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+                **PARQUET_COMPRESSION,
+                use_dictionary=[name for name in table.column_names if name != tof_column],
+                write_statistics=True,
             )
         except Exception as exc:  # pylint: disable=broad-except
             self.failed_files_error.append(f"{parquet_path}: {type(exc)} {exc}")
@@ -645,6 +844,7 @@ class FlashLoader(BaseLoader):
         data_parquet_dir: Path,
         detector: str,
         force_recreate: bool,
+        num_cores: int = None,
     ) -> Tuple[List[Path], List, List]:
         """
         Handles the conversion of buffer files (h5 to parquet) and returns the filenames.
@@ -653,6 +853,8 @@ class FlashLoader(BaseLoader):
             data_parquet_dir (Path): Directory where the parquet files will be stored.
             detector (str): Detector name.
             force_recreate (bool): Forces recreation of buffer files
+            num_cores (int, optional): Maximum number of parallel processes used for the
+                conversion. Defaults to the number of CPUs.
 
         Returns:
             Tuple[List[Path], List, List]: Three lists, one for
@@ -671,7 +873,11 @@ class FlashLoader(BaseLoader):
         parquet_filenames = [
             buffer_file_dir.joinpath(Path(file).stem + detector) for file in self.files
         ]
-        existing_parquet_filenames = [file for file in parquet_filenames if file.exists()]
+        # A single directory listing replaces one stat call per buffer file
+        existing_names = {file.name for file in buffer_file_dir.iterdir()}
+        existing_parquet_filenames = [
+            file for file in parquet_filenames if file.name in existing_names
+        ]
 
         # Raise a value error if no data is available after the conversion
         if len(h5_filenames) == 0:
@@ -679,7 +885,11 @@ class FlashLoader(BaseLoader):
 
         if not force_recreate:
             # Check if the available channels match the schema of the existing parquet files
-            parquet_schemas = [pq.read_schema(file) for file in existing_parquet_filenames]
+            # Reading the footers is I/O bound, so they are read in parallel threads
+            n_jobs = max(1, min(N_CPU, len(existing_parquet_filenames)))
+            parquet_schemas = Parallel(n_jobs=n_jobs, backend="threading")(
+                delayed(pq.read_schema)(file) for file in existing_parquet_filenames
+            )
             config_schema = set(self.get_channels(formats="all", index=True))
             if self._config["dataframe"].get("split_sector_id_from_dld_time", False):
                 config_schema.add(self._config["dataframe"].get("sector_id_column", False))
@@ -709,7 +919,7 @@ class FlashLoader(BaseLoader):
         files_to_read = [
             (h5_path, parquet_path)
             for h5_path, parquet_path in zip(h5_filenames, parquet_filenames)
-            if force_recreate or not parquet_path.exists()
+            if force_recreate or parquet_path.name not in existing_names
         ]
 
         print(f"Reading files: {len(files_to_read)} new files of {len(h5_filenames)} total.")
@@ -719,7 +929,10 @@ class FlashLoader(BaseLoader):
 
         # Convert the remaining h5 files to parquet in parallel if there are any
         if len(files_to_read) > 0:
-            error = Parallel(n_jobs=len(files_to_read), verbose=10)(
+            if num_cores is None:
+                num_cores = N_CPU
+            n_jobs = max(1, min(len(files_to_read), num_cores))
+            error = Parallel(n_jobs=n_jobs, verbose=10)(
                 delayed(self.create_buffer_file)(h5_path, parquet_path)
                 for h5_path, parquet_path in files_to_read
             )
@@ -735,9 +948,12 @@ class FlashLoader(BaseLoader):
 
         print("All files converted successfully!")
 
-        # read all parquet metadata and schema
-        metadata = [pq.read_metadata(file) for file in parquet_filenames]
-        schema = [pq.read_schema(file) for file in parquet_filenames]
+        # read all parquet metadata, the schema is taken from the same footer
+        n_jobs = max(1, min(N_CPU, len(parquet_filenames)))
+        metadata = Parallel(n_jobs=n_jobs, backend="threading")(
+            delayed(pq.read_metadata)(file) for file in parquet_filenames
+        )
+        schema = [file_metadata.schema.to_arrow_schema() for file_metadata in metadata]
 
         return parquet_filenames, metadata, schema
 
@@ -750,6 +966,7 @@ class FlashLoader(BaseLoader):
         load_parquet: bool = False,
         save_parquet: bool = False,
         force_recreate: bool = False,
+        num_cores: int = None,
     ) -> Tuple[dd.DataFrame, dd.DataFrame]:
         """
         Handles loading and saving of parquet files based on the provided parameters.
@@ -764,6 +981,8 @@ class FlashLoader(BaseLoader):
             load_parquet (bool, optional): Loads the entire parquet into the dd dataframe.
             save_parquet (bool, optional): Saves the entire dataframe into a parquet.
             force_recreate (bool, optional): Forces recreation of buffer file.
+            num_cores (int, optional): Maximum number of parallel processes used for the buffer
+                file conversion. Defaults to the number of CPUs.
         Returns:
             tuple: A tuple containing two dataframes:
             - dataframe_electron: Dataframe containing the loaded/augmented electron data.
@@ -801,17 +1020,25 @@ class FlashLoader(BaseLoader):
                 data_parquet_dir,
                 detector,
                 force_recreate,
+                num_cores,
             )
 
-            # Read all parquet files into one dataframe using dask
-            dataframe = dd.read_parquet(filenames, calculate_divisions=True)
-
             # Channels to fill NaN values
             channels: List[str] = self.get_channels(["per_pulse", "per_train"])
 
             overlap = min(file.num_rows for file in metadata)
 
+            # Read all parquet files into one dataframe using dask
+            # Read each file into one partition, as the forward filling relies on the file
+            # lengths. The buffer files carry no index, so there are no divisions to gather.
+            dataframe = dd.read_parquet(
+                filenames,
+                calculate_divisions=False,
+                split_row_groups=False,
+            )
+
             print("Filling nan values...")
+            # The filled dataframe is built once, and shared by both dataframes
             dataframe = dfops.forward_fill_lazy(
                 df=dataframe,
                 columns=channels,
@@ -822,16 +1049,37 @@ class FlashLoader(BaseLoader):
             dataframe_electron = dataframe.dropna(
                 subset=self.get_channels(["per_electron"]),
             )
-            dataframe_pulse = dataframe[
-                self.multi_index + self.get_channels(["per_pulse", "per_train"])
-            ]
+            # The pulse dataframe only holds the index and per_pulse/per_train columns
+            dataframe_pulse = dataframe[self.multi_index + channels]
             dataframe_pulse = dataframe_pulse[
                 (dataframe_pulse["electronId"] == 0) | (np.isnan(dataframe_pulse["electronId"]))
             ]
 
         # Save the dataframe as parquet if requested
         if save_parquet:
-            dataframe_electron.compute().reset_index(drop=True).to_parquet(parquet_path)
+            # Write the partitions in batches, so that the whole dataframe never has to be
+            # held in memory. Neighbouring partitions share the reads of the forward filling,
+            # which are done only once within a batch.
+            partitions = dataframe_electron.to_delayed()
+            writer = None
+            try:
+                for start in range(0, len(partitions), N_CPU):
+                    for partition in dask.compute(*partitions[start : start + N_CPU]):
+                        table = pa.Table.from_pandas(
+                            partition,
+                            schema=writer.schema if writer is not None else None,
+                            preserve_index=False,
+                        )
+                        if writer is None:
+                            writer = pq.ParquetWriter(
+                                parquet_path,
+                                table.schema,
+                                **PARQUET_COMPRESSION,
+                            )
+                        writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+            finally:
+                if writer is not None:
+                    writer.close()
             print("Combined parquet file saved.")
 
         return dataframe_electron, dataframe_pulse
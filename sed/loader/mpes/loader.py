@@ -4,7 +4,6 @@ Mostly ported from https://github.com/mpes-kit/mpes.
 @author: L. Rettig
 """
 import datetime
-import glob
 import io
 import json
 import os
@@ -21,13 +20,35 @@ import dask
 import dask.array as da
 import dask.dataframe as ddf
 import h5py
+import numba
 import numpy as np
-import scipy.interpolate as sint
 from natsort import natsorted
 
 from sed.loader.base.loader import BaseLoader
 
 
+@numba.jit(nogil=True, nopython=True, cache=True)
+def _fill_time_stamps(ms_marker: np.ndarray, start_time: float, out: np.ndarray):
+    """Fills the time stamps of the events in place. The events before the first ms marker
+    get the start time, the ones between the markers i and i + 1 the start time plus (i + 1)
+    ms, and the remaining ones after the last marker the start time plus the number of
+    markers in ms.
+
+    Args:
+        ms_marker (np.ndarray): The monotonically increasing event indices of the ms markers.
+        start_time (float): The start time of the file.
+        out (np.ndarray): The array of event time stamps to fill.
+    """
+    n_events = len(out)
+    lower = 0
+    for i in range(len(ms_marker) + 1):
+        upper = n_events if i == len(ms_marker) else min(max(ms_marker[i], 0), n_events)
+        value = start_time + i / 1000
+        for j in range(lower, upper):
+            out[j] = value
+        lower = upper
+
+
 def load_h5_in_memory(file_path):
     """
     Load an HDF5 file entirely into memory and open it with h5py.
@@ -89,9 +110,10 @@ def hdf5_to_dataframe(
     if alias_dict is None:
         alias_dict = {}
 
-    # Read a file to parse the file structure
+    # Read a file to parse the file structure. Only metadata are read, so the file is not
+    # loaded into memory
     test_fid = kwds.pop("test_fid", 0)
-    test_proc = load_h5_in_memory(files[test_fid])
+    test_proc = h5py.File(files[test_fid], "r")
     if group_names == []:
         group_names, alias_dict = get_groups_and_aliases(
             h5file=test_proc,
@@ -103,13 +125,8 @@ def hdf5_to_dataframe(
     if time_stamps:
         column_names.append(time_stamp_alias)
 
-    test_array = hdf5_to_array(
-        h5filename=files[test_fid],
-        group_names=group_names,
-        time_stamps=time_stamps,
-        ms_markers_group=ms_markers_group,
-        first_event_time_stamp_key=first_event_time_stamp_key,
-    )
+    # the arrays have one row per column, and the dtype of the default float32 data_type
+    dtype = get_array_dtype([np.dtype("float32")], time_stamps)
 
     # Delay-read all files
     arrays = []
@@ -124,8 +141,8 @@ def hdf5_to_dataframe(
                         ms_markers_group=ms_markers_group,
                         first_event_time_stamp_key=first_event_time_stamp_key,
                     ),
-                    dtype=test_array.dtype,
-                    shape=(test_array.shape[0], np.nan),
+                    dtype=dtype,
+                    shape=(len(column_names), np.nan),
                 ),
             )
         except OSError as exc:
@@ -133,7 +150,9 @@ def hdf5_to_dataframe(
                 print(f"Unable to open file {f}: {str(exc)}. Most likely the file is incomplete.")
                 pass
 
-    array_stack = da.concatenate(arrays, axis=1).T
+    # Fuse the linear per-file task chains of the graph into one task per file, as they are
+    # not fused at dataframe level
+    (array_stack,) = dask.optimize(da.concatenate(arrays, axis=1).T)
 
     test_proc.close()
 
@@ -179,9 +198,10 @@ def hdf5_to_timed_dataframe(
     if alias_dict is None:
         alias_dict = {}
 
-    # Read a file to parse the file structure
+    # Read a file to parse the file structure. Only metadata are read, so the file is not
+    # loaded into memory
     test_fid = kwds.pop("test_fid", 0)
-    test_proc = load_h5_in_memory(files[test_fid])
+    test_proc = h5py.File(files[test_fid], "r")
     if group_names == []:
         group_names, alias_dict = get_groups_and_aliases(
             h5file=test_proc,
@@ -193,13 +213,8 @@ def hdf5_to_timed_dataframe(
     if time_stamps:
         column_names.append(time_stamp_alias)
 
-    test_array = hdf5_to_timed_array(
-        h5filename=files[test_fid],
-        group_names=group_names,
-        time_stamps=time_stamps,
-        ms_markers_group=ms_markers_group,
-        first_event_time_stamp_key=first_event_time_stamp_key,
-    )
+    # the arrays have one row per column, and the dtype of the default float32 data_type
+    timed_dtype = get_array_dtype([np.dtype("float32")], time_stamps)
 
     # Delay-read all files
     arrays = []
@@ -214,15 +229,17 @@ def hdf5_to_timed_dataframe(
                         ms_markers_group=ms_markers_group,
                         first_event_time_stamp_key=first_event_time_stamp_key,
                     ),
-                    dtype=test_array.dtype,
-                    shape=(test_array.shape[0], np.nan),
+                    dtype=timed_dtype,
+                    shape=(len(column_names), np.nan),
                 ),
             )
         except OSError as exc:
             if "Unable to synchronously open file" in str(exc):
                 pass
 
-    array_stack = da.concatenate(arrays, axis=1).T
+    # Fuse the linear per-file task chains of the graph into one task per file, as they are
+    # not fused at dataframe level
+    (array_stack,) = dask.optimize(da.concatenate(arrays, axis=1).T)
 
     test_proc.close()
 
@@ -264,6 +281,23 @@ def get_groups_and_aliases(
     return filtered_group_names, alias_dict
 
 
+def get_array_dtype(dtypes: Sequence[np.dtype], time_stamps: bool = False) -> np.dtype:
+    """Returns the dtype of the arrays returned by ``hdf5_to_array`` and
+    ``hdf5_to_timed_array``, which hold the channels and the optional float64 time stamps.
+
+    Args:
+        dtypes (Sequence[np.dtype]): The dtypes of the channels.
+        time_stamps (bool, optional): Whether the array contains time stamps.
+            Defaults to False.
+
+    Returns:
+        np.dtype: The common dtype of the array.
+    """
+    if time_stamps:
+        return np.result_type(*dtypes, np.float64)
+    return np.result_type(*dtypes)
+
+
 def hdf5_to_array(
     h5filename: str,
     group_names: Sequence[str],
@@ -293,58 +327,48 @@ def hdf5_to_array(
 
     h5file = load_h5_in_memory(h5filename)
 
-    # Read out groups:
-    data_list = []
-    for group in group_names:
-        g_dataset = np.asarray(h5file[group])
-        if bool(data_type):
-            g_dataset = g_dataset.astype(data_type)
-        data_list.append(g_dataset)
+    # Read out groups directly into the rows of the output array, with the type conversion
+    # done while reading
+    datasets = [h5file[group] for group in group_names]
+    dtypes = [np.dtype(data_type)] if data_type else [dataset.dtype for dataset in datasets]
+    n_events = datasets[0].len() if datasets else 0
+    data = np.empty(
+        (len(datasets) + int(bool(time_stamps)), n_events),
+        dtype=get_array_dtype(dtypes, time_stamps),
+    )
+    buffers: Dict[np.dtype, np.ndarray] = {}
+    for i, dataset in enumerate(datasets):
+        row_dtype = dtypes[0] if data_type else dataset.dtype
+        if row_dtype == data.dtype:
+            dataset.read_direct(data[i])
+        else:
+            # With the float64 time stamps, the values are still read in their own dtype, so
+            # that they are the same as without time stamps
+            if row_dtype not in buffers:
+                buffers[row_dtype] = np.empty(n_events, dtype=row_dtype)
+            dataset.read_direct(buffers[row_dtype])
+            data[i] = buffers[row_dtype]
 
     # calculate time stamps
     if time_stamps:
-        # create target array for time stamps
-        time_stamp_data = np.zeros(len(data_list[0]))
         # the ms marker contains a list of events that occurred at full ms intervals.
         # It's monotonically increasing, and can contain duplicates
         ms_marker = np.asarray(h5file[ms_markers_group])
 
-        # try to get start timestamp from "FirstEventTimeStamp" attribute
-        try:
-            start_time_str = get_attribute(h5file, first_event_time_stamp_key)
-            start_time = datetime.datetime.strptime(
-                start_time_str,
-                "%Y-%m-%dT%H:%M:%S.%f%z",
-            ).timestamp()
-        except KeyError:
-            # get the start time of the file from its modification date if the key
-            # does not exist (old files)
-            start_time = os.path.getmtime(h5filename)  # convert to ms
-            # the modification time points to the time when the file was finished, so we
-            # need to correct for the time it took to write the file
-            start_time -= len(ms_marker) / 1000
-
-        # fill in range before 1st marker
-        time_stamp_data[0 : ms_marker[0]] = start_time
-        for i in range(len(ms_marker) - 1):
-            # linear interpolation between ms: Disabled, because it takes a lot of
-            # time, and external signals are anyway not better synchronized than 1 ms
-            # time_stamp_data[ms_marker[n] : ms_marker[n + 1]] = np.linspace(
-            #     start_time + n,
-            #     start_time + n + 1,
-            #     ms_marker[n + 1] - ms_marker[n],
-            # )
-            time_stamp_data[ms_marker[i] : ms_marker[i + 1]] = start_time + (i + 1) / 1000
-        # fill any remaining points
-        time_stamp_data[ms_marker[len(ms_marker) - 1] : len(time_stamp_data)] = (
-            start_time + len(ms_marker) / 1000
+        start_time = get_start_time(
+            h5file=h5file,
+            h5filename=h5filename,
+            n_ms_markers=len(ms_marker),
+            first_event_time_stamp_key=first_event_time_stamp_key,
         )
 
-        data_list.append(time_stamp_data)
+        # Linear interpolation between ms is not done, because external signals are anyway
+        # not better synchronized than 1 ms
+        _fill_time_stamps(ms_marker.astype(np.int64), start_time, data[-1])
 
     h5file.close()
 
-    return np.asarray(data_list)
+    return data
 
 
 def hdf5_to_timed_array(
@@ -377,44 +401,119 @@ def hdf5_to_timed_array(
 
     h5file = load_h5_in_memory(h5filename)
 
-    # Read out groups:
-    data_list = []
+    # Read out groups into the rows of the output array, which has the same dtype as the
+    # one of hdf5_to_array
     ms_marker = np.asarray(h5file[ms_markers_group])
-    for group in group_names:
-        g_dataset = np.asarray(h5file[group])
-        if bool(data_type):
-            g_dataset = g_dataset.astype(data_type)
-
-        timed_dataset = np.zeros_like(ms_marker)
-        for i, point in enumerate(ms_marker):
-            timed_dataset[i] = g_dataset[int(point) - 1]
+    datasets = [h5file[group] for group in group_names]
+    dtypes = [np.dtype(data_type)] if data_type else [dataset.dtype for dataset in datasets]
+    data = np.empty(
+        (len(datasets) + int(bool(time_stamps)), len(ms_marker)),
+        dtype=get_array_dtype(dtypes, time_stamps),
+    )
+    # index of the last event before each ms marker, the same for all groups
+    last_events = ms_marker.astype(np.intp)
+    last_events -= 1
+    for i, dataset in enumerate(datasets):
+        # read with the type conversion done by hdf5, without an intermediate array
+        g_dataset = np.empty(dataset.shape, dtype=dtypes[0] if data_type else dataset.dtype)
+        dataset.read_direct(g_dataset)
 
-        data_list.append(timed_dataset)
+        data[i] = g_dataset[last_events]
 
     # calculate time stamps
     if time_stamps:
-        # try to get start timestamp from "FirstEventTimeStamp" attribute
-        try:
-            start_time_str = get_attribute(h5file, first_event_time_stamp_key)
-            start_time = datetime.datetime.strptime(
-                start_time_str,
-                "%Y-%m-%dT%H:%M:%S.%f%z",
-            ).timestamp()
-        except KeyError:
-            # get the start time of the file from its modification date if the key
-            # does not exist (old files)
-            start_time = os.path.getmtime(h5filename)  # convert to ms
-            # the modification time points to the time when the file was finished, so we
-            # need to correct for the time it took to write the file
-            start_time -= len(ms_marker) / 1000
-
-        time_stamp_data = start_time + np.arange(len(ms_marker)) / 1000
+        start_time = get_start_time(
+            h5file=h5file,
+            h5filename=h5filename,
+            n_ms_markers=len(ms_marker),
+            first_event_time_stamp_key=first_event_time_stamp_key,
+        )
 
-        data_list.append(time_stamp_data)
+        data[-1] = start_time + np.arange(len(ms_marker)) / 1000
 
     h5file.close()
 
-    return np.asarray(data_list)
+    return data
+
+
+def get_start_time(
+    h5file: h5py.File,
+    h5filename: str,
+    n_ms_markers: int,
+    first_event_time_stamp_key: str = "FirstEventTimeStamp",
+) -> float:
+    """Returns the start time stamp of an hdf5 file.
+
+    Args:
+        h5file (h5py.File): The open hdf5 file handle.
+        h5filename (str): The hdf5 file name, used for files without start time attribute.
+        n_ms_markers (int): The number of ms markers in the file.
+        first_event_time_stamp_key (str): h5 attribute containing the start
+            timestamp of a file. Defaults to "FirstEventTimeStamp".
+
+    Returns:
+        float: The start time stamp of the file.
+    """
+    # try to get start timestamp from "FirstEventTimeStamp" attribute
+    try:
+        start_time_str = get_attribute(h5file, first_event_time_stamp_key)
+        start_time = datetime.datetime.strptime(
+            start_time_str,
+            "%Y-%m-%dT%H:%M:%S.%f%z",
+        ).timestamp()
+    except KeyError:
+        # get the start time of the file from its modification date if the key
+        # does not exist (old files)
+        start_time = os.path.getmtime(h5filename)  # convert to ms
+        # the modification time points to the time when the file was finished, so we
+        # need to correct for the time it took to write the file
+        start_time -= n_ms_markers / 1000
+
+    return start_time
+
+
+def get_event_time_stamps(
+    h5filename: str,
+    event_ids: Sequence[int],
+    group_name: str,
+    ms_markers_group: str = "msMarkers",
+    first_event_time_stamp_key: str = "FirstEventTimeStamp",
+) -> np.ndarray:
+    """Returns the time stamps of selected events in an hdf5 file, as calculated by
+    ``hdf5_to_array``. Only the ms markers and the length of one group are read.
+
+    Args:
+        h5filename (str): hdf5 file name to read from
+        event_ids (Sequence[int]): Indices of the events. Negative indices count from the
+            end.
+        group_name (str): A group name, whose length gives the number of events.
+        ms_markers_group (str): h5 column containing timestamp information.
+            Defaults to "msMarkers".
+        first_event_time_stamp_key (str): h5 attribute containing the start
+            timestamp of a file. Defaults to "FirstEventTimeStamp".
+
+    Returns:
+        np.ndarray: The time stamps of the events.
+    """
+    with h5py.File(h5filename, "r") as h5file:
+        n_events = h5file[group_name].len()
+        ms_marker = np.asarray(h5file[ms_markers_group])
+        start_time = get_start_time(
+            h5file=h5file,
+            h5filename=h5filename,
+            n_ms_markers=len(ms_marker),
+            first_event_time_stamp_key=first_event_time_stamp_key,
+        )
+
+    events = np.arange(n_events)[np.asarray(event_ids)]
+    # the time stamp of an event increases by 1 ms for each ms marker up to the event
+    passed_markers = np.searchsorted(
+        np.clip(ms_marker.astype(np.int64), 0, n_events),
+        events,
+        side="right",
+    )
+
+    return start_time + passed_markers / 1000
 
 
 def get_attribute(h5group: h5py.Group, attribute: str) -> str:
@@ -454,11 +553,15 @@ def get_count_rate(
         Tuple[np.ndarray, np.ndarray]: The count rate in Hz and the seconds into the
         scan.
     """
-    ms_markers = np.asarray(h5file[ms_markers_group])
+    ms_markers = np.asarray(h5file[ms_markers_group], dtype=np.float64)
     secs = np.arange(0, len(ms_markers)) / 1000
-    msmarker_spline = sint.InterpolatedUnivariateSpline(secs, ms_markers, k=1)
-    rate_spline = msmarker_spline.derivative()
-    count_rate = rate_spline(secs)
+    # Without an interval between two markers, there is no slope to take the rate from
+    if len(ms_markers) < 2:
+        return (np.zeros(len(secs)), secs)
+    # The slope of the markers between neighboring ms, as the derivative of their linear
+    # interpolation. The last marker gets the slope of the interval before it.
+    count_rate = np.diff(ms_markers) * 1000
+    count_rate = np.append(count_rate, count_rate[-1:])
 
     return (count_rate, secs)
 
@@ -503,11 +606,12 @@ def get_archiver_data(
     iso_to = datetime.datetime.utcfromtimestamp(ts_to).isoformat()
     req_str = archiver_url + archiver_channel + "&from=" + iso_from + "Z&to=" + iso_to + "Z"
     with urlopen(req_str) as req:
-        data = json.load(req)
-        secs = [x["secs"] + x["nanos"] * 1e-9 for x in data[0]["data"]]
-        vals = [x["val"] for x in data[0]["data"]]
+        data = json.load(req)[0]["data"]
+        secs = np.fromiter((x["secs"] for x in data), dtype=np.float64, count=len(data))
+        secs += np.fromiter((x["nanos"] for x in data), dtype=np.float64, count=len(data)) * 1e-9
+        vals = np.asarray([x["val"] for x in data])
 
-    return (np.asarray(secs), np.asarray(vals))
+    return (secs, vals)
 
 
 class MpesLoader(BaseLoader):
@@ -695,15 +799,22 @@ class MpesLoader(BaseLoader):
         if isinstance(folders, str):
             folders = [folders]
 
+        # Match the file names while walking the folders once, instead of listing every
+        # directory a second time for the pattern matching as a recursive glob does.
+        # Like glob, hidden files and directories are skipped.
+        prefix = "Scan" + str(run_id).zfill(4) + "_"
+        suffix = "." + extension
         files: List[str] = []
         for folder in folders:
-            run_files = natsorted(
-                glob.glob(
-                    folder + "/**/Scan" + str(run_id).zfill(4) + "_*." + extension,
-                    recursive=True,
-                ),
-            )
-            files.extend(run_files)
+            run_files = []
+            for root, dirs, filenames in os.walk(folder, followlinks=True):
+                dirs[:] = [name for name in dirs if not name.startswith(".")]
+                run_files.extend(
+                    os.path.join(root, name)
+                    for name in filenames
+                    if name.startswith(prefix) and name.endswith(suffix)
+                )
+            files.extend(natsorted(run_files))
 
         # Check if any files are found
         if not files:
@@ -720,20 +831,17 @@ class MpesLoader(BaseLoader):
         Returns:
             Tuple[float, float]: A tuple containing the start and end time stamps
         """
-        h5filename = self.files[0]
-        timestamps = hdf5_to_array(
-            h5filename=h5filename,
-            group_names=self._config["dataframe"]["hdf5_groupnames"],
-            time_stamps=True,
-        )
-        ts_from = timestamps[-1][1]
-        h5filename = self.files[-1]
-        timestamps = hdf5_to_array(
-            h5filename=h5filename,
-            group_names=self._config["dataframe"]["hdf5_groupnames"],
-            time_stamps=True,
-        )
-        ts_to = timestamps[-1][-1]
+        group_name = self._config["dataframe"]["hdf5_groupnames"][0]
+        ts_from = get_event_time_stamps(
+            h5filename=self.files[0],
+            event_ids=[1],
+            group_name=group_name,
+        )[0]
+        ts_to = get_event_time_stamps(
+            h5filename=self.files[-1],
+            event_ids=[-1],
+            group_name=group_name,
+        )[0]
         return (ts_from, ts_to)
 
     def gather_metadata(
@@ -825,73 +933,76 @@ class MpesLoader(BaseLoader):
                 break
 
         # Determine the correct aperture_config
+        metadata_config = self._config["metadata"]
         stamps = sorted(
-            list(self._config["metadata"]["aperture_config"]) + [start],
+            list(metadata_config["aperture_config"]) + [start],
         )
         current_index = stamps.index(start)
         timestamp = stamps[current_index - 1]  # pick last configuration before file date
+        aperture_config = metadata_config["aperture_config"][timestamp]
+        file_metadata = metadata["file"]
 
         # Aperture metadata
         if "instrument" not in metadata.keys():
             metadata["instrument"] = {"analyzer": {}}
-        metadata["instrument"]["analyzer"]["fa_shape"] = "circle"
-        metadata["instrument"]["analyzer"]["ca_shape"] = "circle"
-        metadata["instrument"]["analyzer"]["fa_size"] = np.nan
-        metadata["instrument"]["analyzer"]["ca_size"] = np.nan
+        analyzer = metadata["instrument"]["analyzer"]
+        analyzer["fa_shape"] = "circle"
+        analyzer["ca_shape"] = "circle"
+        analyzer["fa_size"] = np.nan
+        analyzer["ca_size"] = np.nan
         # get field aperture shape and size
-        if {
-            self._config["metadata"]["fa_in_channel"],
-            self._config["metadata"]["fa_hor_channel"],
-        }.issubset(set(metadata["file"].keys())):
-            fa_in = metadata["file"][self._config["metadata"]["fa_in_channel"]]
-            fa_hor = metadata["file"][self._config["metadata"]["fa_hor_channel"]]
-            for key, value in self._config["metadata"]["aperture_config"][timestamp][
-                "fa_size"
-            ].items():
+        fa_in_channel = metadata_config["fa_in_channel"]
+        fa_hor_channel = metadata_config["fa_hor_channel"]
+        if fa_in_channel in file_metadata and fa_hor_channel in file_metadata:
+            fa_in = file_metadata[fa_in_channel]
+            fa_hor = file_metadata[fa_hor_channel]
+            for key, value in aperture_config["fa_size"].items():
                 if value[0][0] < fa_in < value[0][1] and value[1][0] < fa_hor < value[1][1]:
                     try:
                         k_float = float(key)
-                        metadata["instrument"]["analyzer"]["fa_size"] = k_float
+                        analyzer["fa_size"] = k_float
                     except ValueError:  # store string if numeric interpretation fails
-                        metadata["instrument"]["analyzer"]["fa_shape"] = key
+                        analyzer["fa_shape"] = key
                     break
             else:
                 print("Field aperture size not found.")
 
         # get contrast aperture shape and size
-        if self._config["metadata"]["ca_in_channel"] in metadata["file"]:
-            ca_in = metadata["file"][self._config["metadata"]["ca_in_channel"]]
-            for key, value in self._config["metadata"]["aperture_config"][timestamp][
-                "ca_size"
-            ].items():
+        if metadata_config["ca_in_channel"] in file_metadata:
+            ca_in = file_metadata[metadata_config["ca_in_channel"]]
+            for key, value in aperture_config["ca_size"].items():
                 if value[0] < ca_in < value[1]:
                     try:
                         k_float = float(key)
-                        metadata["instrument"]["analyzer"]["ca_size"] = k_float
+                        analyzer["ca_size"] = k_float
                     except ValueError:  # store string if numeric interpretation fails
-                        metadata["instrument"]["analyzer"]["ca_shape"] = key
+                        analyzer["ca_shape"] = key
                     break
             else:
                 print("Contrast aperture size not found.")
 
         # Storing the lens modes corresponding to lens voltages.
         # Use lens voltages present in first lens_mode entry.
-        lens_list = self._config["metadata"]["lens_mode_config"][
-            next(iter(self._config["metadata"]["lens_mode_config"]))
-        ].keys()
+        lens_mode_config = metadata_config["lens_mode_config"]
+        lens_list = lens_mode_config[next(iter(lens_mode_config))].keys()
 
         lens_volts = np.array(
-            [metadata["file"].get(f"KTOF:Lens:{lens}:V", np.NaN) for lens in lens_list],
+            [file_metadata.get(f"KTOF:Lens:{lens}:V", np.NaN) for lens in lens_list],
         )
-        for mode, value in self._config["metadata"]["lens_mode_config"].items():
-            lens_volts_config = np.array([value[k] for k in lens_list])
-            if np.allclose(
-                lens_volts,
-                lens_volts_config,
-                rtol=0.005,
-            ):  # Equal upto 0.5% tolerance
-                metadata["instrument"]["analyzer"]["lens_mode"] = mode
-                break
+        # Compare with all modes at once, one row per mode. Modes lacking a lens voltage
+        # cannot match.
+        lens_volts_config = np.array(
+            [[value.get(k, np.nan) for k in lens_list] for value in lens_mode_config.values()],
+            dtype=np.float64,
+        )
+        matching_modes = np.flatnonzero(
+            np.all(
+                np.isclose(lens_volts, lens_volts_config, rtol=0.005),  # Equal upto 0.5%
+                axis=1,
+            ),
+        )
+        if len(matching_modes) > 0:
+            analyzer["lens_mode"] = list(lens_mode_config)[matching_modes[0]]
         else:
             print(
                 "Lens mode for given lens voltages not found. "
@@ -900,13 +1011,13 @@ class MpesLoader(BaseLoader):
 
         # Determining projection from the lens mode
         try:
-            lens_mode = metadata["instrument"]["analyzer"]["lens_mode"]
+            lens_mode = analyzer["lens_mode"]
             if "spatial" in lens_mode.split("_")[1]:
-                metadata["instrument"]["analyzer"]["projection"] = "real"
-                metadata["instrument"]["analyzer"]["scheme"] = "momentum dispersive"
+                analyzer["projection"] = "real"
+                analyzer["scheme"] = "momentum dispersive"
             else:
-                metadata["instrument"]["analyzer"]["projection"] = "reciprocal"
-                metadata["instrument"]["analyzer"]["scheme"] = "spatial dispersive"
+                analyzer["projection"] = "reciprocal"
+                analyzer["scheme"] = "spatial dispersive"
         except IndexError:
             print(
                 "Lens mode must have the form, '6kV_kmodem4.0_20VTOF_v3.sav'. "
@@ -956,10 +1067,12 @@ class MpesLoader(BaseLoader):
         accumulated_time = 0
         for fid in fids:
             try:
-                count_rate_, secs_ = get_count_rate(
-                    load_h5_in_memory(self.files[fid]),
-                    ms_markers_group=ms_markers_group,
-                )
+                # only the ms markers are read, so the file is not loaded into memory
+                with h5py.File(self.files[fid], "r") as h5file:
+                    count_rate_, secs_ = get_count_rate(
+                        h5file,
+                        ms_markers_group=ms_markers_group,
+                    )
                 secs_list.append((accumulated_time + secs_).T)
                 count_rate_list.append(count_rate_.T)
                 accumulated_time += secs_[-1]
@@ -1001,10 +1114,13 @@ class MpesLoader(BaseLoader):
         secs = 0.0
         for fid in fids:
             try:
-                secs += get_elapsed_time(
-                    load_h5_in_memory(self.files[fid]),
-                    ms_markers_group=ms_markers_group,
-                )
+                # only the length of the ms markers is read, so the file is not loaded into
+                # memory
+                with h5py.File(self.files[fid], "r") as h5file:
+                    secs += get_elapsed_time(
+                        h5file,
+                        ms_markers_group=ms_markers_group,
+                    )
             except OSError as exc:
                 if "Unable to synchronously open file" in str(exc):
                     print(f"Unable to open file {fid}: {str(exc)}")
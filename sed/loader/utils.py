@@ -9,6 +9,7 @@ from typing import Union
 import dask.dataframe
 import numpy as np
 import pandas as pd
+from h5py import Dataset
 from h5py import File
 from h5py import Group
 from natsort import natsorted
@@ -96,6 +97,41 @@ def parse_h5_keys(h5_file: File, prefix: str = "") -> List[str]:
     return file_channel_list
 
 
+def read_h5_dataset(dataset: Dataset) -> np.ndarray:
+    """Reads the full content of an h5 dataset.
+
+    Contiguous, uncompressed datasets are memory-mapped directly from the file, which avoids
+    the copy through the hdf5 library. Other numeric datasets are read into a preallocated
+    array with a single read_direct call, all remaining ones with a plain h5py read.
+
+    Args:
+        dataset (h5py.Dataset): The dataset to read.
+
+    Returns:
+        np.ndarray: The dataset content. Memory-mapped arrays are read-only.
+    """
+    if dataset.dtype.kind not in "biuf" or dataset.size == 0 or dataset.shape == ():
+        return dataset[()]
+    if (
+        dataset.chunks is None
+        and dataset.compression is None
+        and not dataset.external
+        and dataset.file.driver in ("sec2", "stdio")
+    ):
+        offset = dataset.id.get_offset()
+        if offset is not None:
+            return np.memmap(
+                dataset.file.filename,
+                dtype=dataset.dtype,
+                mode="r",
+                offset=offset,
+                shape=dataset.shape,
+            )
+    out = np.empty(dataset.shape, dtype=dataset.dtype)
+    dataset.read_direct(out)
+    return out
+
+
 def split_channel_bitwise(
     df: dask.dataframe.DataFrame,
     input_column: str,
@@ -138,8 +174,13 @@ def split_channel_bitwise(
         raise ValueError("Exactly two types must be given.")
     elif not all(isinstance(t, type) for t in types):
         raise ValueError("types must be a sequence of types.")
-    df[output_columns[0]] = (df[input_column] % 2**bit_mask).astype(types[0])
-    df[output_columns[1]] = (df[input_column] // 2**bit_mask).astype(types[1])
+    if np.issubdtype(df[input_column].dtype, np.integer):
+        # Integer columns are split with bitwise operations instead of division
+        df[output_columns[0]] = (df[input_column] & (2**bit_mask - 1)).astype(types[0])
+        df[output_columns[1]] = np.right_shift(df[input_column], bit_mask).astype(types[1])
+    else:
+        df[output_columns[0]] = (df[input_column] % 2**bit_mask).astype(types[0])
+        df[output_columns[1]] = (df[input_column] // 2**bit_mask).astype(types[1])
     return df
 
 
@@ -4,6 +4,8 @@ from importlib.util import find_spec
 from pathlib import Path
 from typing import Literal
 
+import h5py
+import numpy as np
 import pytest
 
 from sed.core.config import parse_config
@@ -167,6 +169,55 @@ def test_group_name_not_in_h5(config_file: dict) -> None:
     assert str(e.value.args[0]) == "The group_name for channel dldPosX does not exist."
 
 
+def test_electron_index_unique(config_file: dict) -> None:
+    """
+    Test that the electron index is sorted and unique, also for trains where the pulseIds of the
+    electrons are not in order.
+    """
+    fl = FlashLoader(config=config_file)
+    df = fl.create_dataframe_per_file(Path(config_file["core"]["paths"]["data_raw_dir"] + H5_PATH))
+
+    assert df.index.is_monotonic_increasing
+    assert df.index.is_unique
+    assert len(df) == 102240
+
+
+def test_channel_dtype(config_file: dict) -> None:
+    """
+    Test that the optional dtype of a channel is applied to its data.
+    """
+    config = config_file
+    config["dataframe"]["channels"]["dldPosX"]["dtype"] = "float64"
+    fl = FlashLoader(config=config)
+    df = fl.create_dataframe_per_file(Path(config["core"]["paths"]["data_raw_dir"] + H5_PATH))
+
+    assert df["dldPosX"].dtype == "float64"
+    assert df["dldPosY"].dtype == "float32"
+
+
+def test_channel_integer_dtype(config_file: dict) -> None:
+    """
+    Test that an integer dtype of a per electron channel is applied after the NaN padding
+    is removed, so that the padding doesn't turn into electrons.
+    """
+    config = config_file
+    fl = FlashLoader(config=config)
+    with h5py.File(Path(config["core"]["paths"]["data_raw_dir"] + H5_PATH), "r") as h5_file:
+        expected = fl.create_dataframe_per_channel(h5_file, "dldPosX")
+
+    config["dataframe"]["channels"]["dldPosX"]["dtype"] = "int32"
+    fl = FlashLoader(config=config)
+    with h5py.File(Path(config["core"]["paths"]["data_raw_dir"] + H5_PATH), "r") as h5_file:
+        data = fl.create_dataframe_per_channel(h5_file, "dldPosX")
+
+    assert data["dldPosX"].dtype == "int32"
+    assert len(data) == len(expected)
+    np.testing.assert_array_equal(
+        data["dldPosX"].to_numpy(),
+        expected["dldPosX"].to_numpy().astype("int32"),
+    )
+
+
 def test_buffer_schema_mismatch(config_file: dict) -> None:
     """
     Test function to verify schema mismatch handling in the FlashLoader's 'read_dataframe' method.
@@ -223,3 +274,27 @@ def test_buffer_schema_mismatch(config_file: dict) -> None:
     _, parquet_data_dir = fl.initialize_paths()
     for file in os.listdir(Path(parquet_data_dir, "buffer")):
         os.remove(Path(parquet_data_dir, "buffer", file))
+
+
+def test_save_and_load_parquet(config_file: dict, tmp_path: Path) -> None:
+    """
+    Test that the combined parquet file saved by read_dataframe can be loaded again.
+    """
+    parquet_path = tmp_path / "run_43878.parquet"
+    fl = FlashLoader(config=config_file)
+    df, _, _ = fl.read_dataframe(runs=["43878"], save_parquet=True, parquet_path=parquet_path)
+
+    fl = FlashLoader(config=config_file)
+    df_loaded, _, _ = fl.read_dataframe(
+        runs=["43878"],
+        load_parquet=True,
+        parquet_path=parquet_path,
+    )
+
+    assert list(df_loaded.columns) == list(df.columns)
+    assert len(df_loaded) == len(df)
+
+    # Clean up created buffer files after the test
+    _, parquet_data_dir = fl.initialize_paths()
+    for file in os.listdir(Path(parquet_data_dir, "buffer")):
+        os.remove(Path(parquet_data_dir, "buffer", file))
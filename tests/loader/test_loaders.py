@@ -8,6 +8,8 @@ from typing import cast
 from typing import List
 
 import dask.dataframe as ddf
+import h5py
+import numpy as np
 import pytest
 from _pytest.mark.structures import ParameterSet
 
@@ -16,6 +18,10 @@ from sed.loader.base.loader import BaseLoader
 from sed.loader.flash.loader import FlashLoader
 from sed.loader.loader_interface import get_loader
 from sed.loader.loader_interface import get_names_of_all_loaders
+from sed.loader.mpes.loader import get_count_rate
+from sed.loader.mpes.loader import get_event_time_stamps
+from sed.loader.mpes.loader import hdf5_to_array
+from sed.loader.mpes.loader import hdf5_to_timed_array
 from sed.loader.utils import gather_files
 
 package_dir = os.path.dirname(find_spec("sed").origin)
@@ -312,3 +318,87 @@ def test_mpes_timestamps() -> None:
         time_stamps=True,
     )
     assert "timeStamps" in df.columns
+
+
+def test_mpes_event_time_stamps() -> None:
+    """Function to test that the time stamps of selected events match the ones calculated
+    for the full array"""
+    files = gather_files(os.path.join(test_data_dir, "loader", "mpes"), extension="h5")
+    for file in files:
+        array = hdf5_to_array(h5filename=file, group_names=["Stream_0"], time_stamps=True)
+        event_ids = np.arange(array.shape[1])
+        time_stamps = get_event_time_stamps(file, event_ids=event_ids, group_name="Stream_0")
+        np.testing.assert_array_equal(time_stamps, array[-1])
+        assert get_event_time_stamps(file, [-1], group_name="Stream_0")[0] == array[-1][-1]
+
+
+def test_mpes_array_time_stamps_data_type() -> None:
+    """Function to test that the data rows of the mpes arrays are in the same data type
+    precision with and without time stamps"""
+    files = gather_files(os.path.join(test_data_dir, "loader", "mpes"), extension="h5")
+    for file in files:
+        array = hdf5_to_array(h5filename=file, group_names=["Stream_0", "Stream_1"])
+        array_time_stamps = hdf5_to_array(
+            h5filename=file,
+            group_names=["Stream_0", "Stream_1"],
+            time_stamps=True,
+        )
+        assert array_time_stamps.dtype == np.float64
+        np.testing.assert_array_equal(array_time_stamps[:-1], array)
+
+
+def test_mpes_timed_array_time_stamps_data_type() -> None:
+    """Function to test that the data rows of the mpes timed arrays are the same with and
+    without time stamps"""
+    files = gather_files(os.path.join(test_data_dir, "loader", "mpes"), extension="h5")
+    for file in files:
+        array = hdf5_to_timed_array(h5filename=file, group_names=["Stream_0", "Stream_1"])
+        array_time_stamps = hdf5_to_timed_array(
+            h5filename=file,
+            group_names=["Stream_0", "Stream_1"],
+            time_stamps=True,
+        )
+        assert array.dtype == np.float32
+        assert array_time_stamps.dtype == np.float64
+        np.testing.assert_array_equal(array_time_stamps[:-1], array)
+
+
+@pytest.mark.parametrize("ms_markers", [[], [5]])
+def test_mpes_count_rate_few_markers(ms_markers: List[int], tmp_path: Path) -> None:
+    """Function to test that the mpes count rate has one value per ms marker for files with
+    fewer than two ms markers"""
+    with h5py.File(tmp_path / "few_markers.h5", "w") as h5file:
+        h5file.create_dataset("msMarkers", data=np.asarray(ms_markers, dtype=np.int64))
+        count_rate, secs = get_count_rate(h5file)
+    assert len(count_rate) == len(secs) == len(ms_markers)
+    np.testing.assert_array_equal(count_rate, np.zeros(len(ms_markers)))
+
+
+def test_mpes_lens_mode_incomplete_config() -> None:
+    """Function to test that an incomplete lens mode configuration does not prevent finding
+    the matching lens mode"""
+    config = parse_config(
+        config={},
+        folder_config={},
+        user_config=package_dir + "/../sed/config/mpes_example_config.yaml",
+        system_config={},
+    )
+    config["metadata"]["epics_pvs"] = []
+    lens_mode_config = config["metadata"]["lens_mode_config"]
+    mode = "6kV_kmodem4.0_30VTOF_453ns_focus.sav"
+    lens_mode_config[mode]["MCPfront"] = 21.0
+    lens_mode_config[mode]["Z1"] = 2450
+    lens_mode_config[mode]["F"] = 69.23
+    # an incomplete mode directly after the first one, which defines the lenses to compare
+    incomplete_mode = {key: value for key, value in lens_mode_config[mode].items() if key != "F"}
+    modes = list(lens_mode_config.items())
+    config["metadata"]["lens_mode_config"] = dict(
+        modes[:1] + [("incomplete.sav", incomplete_mode)] + modes[1:],
+    )
+
+    loader = get_loader("mpes", config=config)
+    _, _, metadata = loader.read_dataframe(
+        folders=os.path.join(test_data_dir, "loader", "mpes"),
+        collect_metadata=True,
+    )
+    assert metadata["instrument"]["analyzer"]["lens_mode"] == mode
@@ -1,10 +1,12 @@
 """Module tests.loader.test_utils, tests for the sed.load.utils file
 """
 import dask.dataframe as dd
+import h5py
 import numpy as np
 import pandas as pd
 import pytest
 
+from sed.loader.utils import read_h5_dataset
 from sed.loader.utils import split_channel_bitwise
 
 test_df = pd.DataFrame(
@@ -30,6 +32,15 @@ def test_split_channel_bitwise() -> None:
     pd.testing.assert_frame_equal(result.compute(), expected_output)
 
 
+def test_split_channel_bitwise_float() -> None:
+    """Test that split_channel_bitwise gives the same result for float columns"""
+    output_columns = ["b", "c"]
+    bit_mask = 2
+    df_int = split_channel_bitwise(test_df.copy(), "a", output_columns, bit_mask)
+    df_float = split_channel_bitwise(test_df.astype(np.float32), "a", output_columns, bit_mask)
+    pd.testing.assert_frame_equal(df_float[output_columns], df_int[output_columns])
+
+
 def test_split_channel_bitwise_raises() -> None:
     """Test split_channel_bitwise function raises"""
     pytest.raises(
@@ -90,3 +101,17 @@ def test_split_channel_bitwise_raises() -> None:
         },
     )
     pytest.raises(KeyError, split_channel_bitwise, other_df, "a", ["b", "c"], 3, False, None)
+
+
+def test_read_h5_dataset(tmp_path) -> None:
+    """Test that read_h5_dataset returns the same data for contiguous and chunked datasets"""
+    data = np.arange(24, dtype=np.float32).reshape(4, 6)
+    with h5py.File(tmp_path / "test.h5", "w") as h5_file:
+        h5_file.create_dataset("contiguous", data=data)
+        h5_file.create_dataset("chunked", data=data, chunks=(2, 3), compression="gzip")
+    with h5py.File(tmp_path / "test.h5", "r") as h5_file:
+        contiguous = read_h5_dataset(h5_file["contiguous"])
+        chunked = read_h5_dataset(h5_file["chunked"])
+        assert isinstance(contiguous, np.memmap)
+        np.testing.assert_array_equal(contiguous, data)
+        np.testing.assert_array_equal(chunked, data)
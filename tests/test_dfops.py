@@ -36,6 +36,23 @@ def test_apply_jitter() -> None:
         assert col in df_jittered.columns
 
 
+def test_apply_jitter_amplitude() -> None:
+    """Test that uniform jitter stays within the requested amplitude."""
+    df_jittered = apply_jitter(df.copy(), cols=cols, amps=0.25)
+    for col in cols:
+        assert np.all(np.abs(df_jittered[col + "_jittered"] - df[col]) <= 0.25)
+
+
+@pytest.mark.parametrize("jitter_type", ["uniform", "normal"])
+def test_apply_jitter_seed(jitter_type: str) -> None:
+    """Test that the jitter is reproducible by seeding the global numpy random state."""
+    np.random.seed(42)
+    df_jittered = apply_jitter(df.copy(), cols=cols, jitter_type=jitter_type)
+    np.random.seed(42)
+    df_jittered_2 = apply_jitter(df.copy(), cols=cols, jitter_type=jitter_type)
+    pd.testing.assert_frame_equal(df_jittered, df_jittered_2)
+
+
 def test_drop_column() -> None:
     """Test function to drop a df column."""
     column_name = "energy"
@@ -376,6 +393,40 @@ def test_offset_by_other_columns_functionality() -> None:
     np.testing.assert_allclose(res["target"].values, expected)
 
 
+def test_offset_by_other_columns_dtypes() -> None:
+    """test that the row offsets are accumulated in the common dtype of the columns"""
+    pd_df = pd.DataFrame(
+        {
+            "target": np.array([1e4, 2e4, 3e4, 4e4], dtype=np.float32),
+            "int_target": np.array([10, 20, 30, 40], dtype=np.int64),
+            "off1": [1e-3, 2e-3, 3e-3, 4e-3],
+            "off2": [1e-3, 1e-3, 1e-3, 1e-3],
+            "int_off": np.array([1, 2, 3, 4], dtype=np.int64),
+        },
+    )
+    t_df = ddf.from_pandas(pd_df, npartitions=2)
+    res = offset_by_other_columns(
+        df=t_df.copy(),
+        target_column="target",
+        offset_columns=["off1", "off2"],
+        weights=[1, 1],
+    )
+    expected = pd_df["target"].to_numpy(dtype=np.float64) + pd_df["off1"] + pd_df["off2"]
+    assert res["target"].dtype == np.float64
+    assert res["target"].compute().dtype == np.float64
+    np.testing.assert_allclose(res["target"].compute().to_numpy(), expected, rtol=0, atol=1e-9)
+
+    res = offset_by_other_columns(
+        df=t_df.copy(),
+        target_column="int_target",
+        offset_columns=["int_off"],
+        weights=[-1],
+    )
+    assert res["int_target"].dtype == np.int64
+    assert res["int_target"].compute().dtype == np.int64
+    np.testing.assert_array_equal(res["int_target"].compute().to_numpy(), [9, 18, 27, 36])
+
+
 def test_offset_by_other_columns_pandas_not_working() -> None:
     """test that the offset_by_other_columns function raises an error when
     used with pandas
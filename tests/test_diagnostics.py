@@ -40,3 +40,35 @@ def test_plot_histogram(ncols: int, backend: str) -> None:
             axes[loc] = config["dataframe"].get(axis.strip("@"))
     values = {axis: dataframe[axis].compute() for axis in axes}
     grid_histogram(values, ncols, axes, bins, ranges, backend)
+
+
+@pytest.mark.parametrize(
+    "histkwds",
+    [{"density": True}, {"cumulative": True}, {"histtype": "barstacked"}],
+)
+def test_plot_histogram_hist_keywords(histkwds: dict) -> None:
+    """Test that matplotlib.pyplot.hist() keywords are accepted by the matplotlib backend
+
+    Args:
+        histkwds (dict): keyword arguments for the histograms
+    """
+    dataframe, _, _ = loader.read_dataframe(files=files)
+    axes = config["histogram"]["axes"]
+    ranges = config["histogram"]["ranges"]
+    bins = config["histogram"]["bins"]
+    for loc, axis in enumerate(axes):
+        if axis.startswith("@"):
+            axes[loc] = config["dataframe"].get(axis.strip("@"))
+    values = {axis: dataframe[axis].compute() for axis in axes}
+    histkwds = histkwds.copy()
+    histtype = histkwds.pop("histtype", "step")
+    grid_histogram(
+        values,
+        2,
+        axes,
+        bins,
+        ranges,
+        "matplotlib",
+        histkwds=histkwds,
+        histtype=histtype,
+    )
@@ -73,3 +73,30 @@ def test_repr_html(meta_handler):
     html_test += "<div style='padding-left: 20px;'><b>Name</b> [name]: Sample Name"
     html_test += "</div></details></div>"
     assert html == html_test
+
+
+def test_repr_truncated():
+    # Test that the representations of deep or long metadata are truncated
+    nested: Dict[Any, Any] = {"values": list(range(100))}
+    for i in range(10):
+        nested = {f"level_{i}": nested}
+    meta_handler = MetaHandler(meta=nested)
+    text = repr(meta_handler)
+    assert "..." in text
+    assert "level_5" in text
+    assert "level_4" not in text
+    meta_handler.add({"new": 1}, "entry")
+    assert repr(meta_handler) != text
+    assert "..." in meta_handler._repr_html_()
+
+
+def test_repr_after_modification():
+    # Test that the representations follow modifications of the handed out metadata
+    meta_handler = MetaHandler(meta={"entry": 1})
+    metadata = meta_handler.metadata
+    text = repr(meta_handler)
+    html = meta_handler._repr_html_()
+    metadata["x"] = 1
+    assert repr(meta_handler) != text
+    assert '"x": 1' in repr(meta_handler)
+    assert meta_handler._repr_html_() != html